@@ -0,0 +1,21 @@
+# gunicorn.conf.py
+#
+# Production server settings. Start with:
+#   gunicorn -c gunicorn.conf.py run:app
+
+import multiprocessing
+
+from decouple import config
+
+bind: str = config("GUNICORN_BIND", default="0.0.0.0:5000")
+
+# Each worker is a separate process; threads let one worker keep serving
+# other requests while a request waits on Supabase.
+workers: int = config(
+    "GUNICORN_WORKERS", default=multiprocessing.cpu_count() * 2 + 1, cast=int
+)
+worker_class: str = "gthread"
+threads: int = config("GUNICORN_THREADS", default=8, cast=int)
+
+keepalive: int = 30
+timeout: int = 60
@@ -0,0 +1,35 @@
+-- migrations/001_resume_full_text_search.sql
+--
+-- Full-text search support for /api/analyze when RANKING_BACKEND=postgres.
+-- Scoring happens inside Postgres, so only the top-ranked rows are sent back
+-- to the API instead of every resume body.
+
+ALTER TABLE resumes
+    ADD COLUMN IF NOT EXISTS resume_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(resume_text, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_resumes_resume_tsv
+    ON resumes USING gin (resume_tsv);
+
+-- q uses websearch_to_tsquery syntax, e.g. '"machine learning" or python'.
+CREATE OR REPLACE FUNCTION rank_resumes(q text, lim int)
+RETURNS TABLE (score real, pdf_url text, candidate jsonb)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        ts_rank(r.resume_tsv, query) AS score,
+        r.pdf_url,
+        jsonb_build_object(
+            'id', c.id,
+            'full_name', c.full_name,
+            'email', c.email,
+            'phone_number', c.phone_number
+        ) AS candidate
+    FROM resumes r
+    JOIN candidates c ON c.id = r.candidate_id
+    CROSS JOIN websearch_to_tsquery('english', q) AS query
+    WHERE r.resume_tsv @@ query
+    ORDER BY score DESC
+    LIMIT lim;
+$$;
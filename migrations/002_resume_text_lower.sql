@@ -0,0 +1,8 @@
+-- migrations/002_resume_text_lower.sql
+--
+-- Stores a lowercased copy of each resume so the in-process scorer
+-- (RANKING_BACKEND=python) no longer lowercases every resume on every request.
+
+ALTER TABLE resumes
+    ADD COLUMN IF NOT EXISTS resume_text_lower text
+    GENERATED ALWAYS AS (lower(resume_text)) STORED;
@@ -0,0 +1,43 @@
+-- migrations/003_rank_resumes_keyword_array.sql
+--
+-- Replaces rank_resumes(q, lim) with a version that takes the keyword list
+-- directly and builds the OR query in SQL. Rows are ordered by ts_rank_cd and
+-- cut to max_results in the database, so only the rows the API returns are
+-- ever sent over the wire.
+
+DROP FUNCTION IF EXISTS rank_resumes(text, int);
+
+CREATE OR REPLACE FUNCTION rank_resumes(keywords text[], max_results int)
+RETURNS TABLE (score real, pdf_url text, candidate jsonb)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH search AS (
+        -- Each keyword becomes a quoted websearch phrase, OR-ed together.
+        SELECT websearch_to_tsquery(
+            'english',
+            array_to_string(
+                ARRAY(
+                    SELECT '"' || replace(kw, '"', ' ') || '"'
+                    FROM unnest(keywords) AS kw
+                ),
+                ' or '
+            )
+        ) AS query
+    )
+    SELECT
+        ts_rank_cd(r.resume_tsv, search.query) AS score,
+        r.pdf_url,
+        jsonb_build_object(
+            'id', c.id,
+            'full_name', c.full_name,
+            'email', c.email,
+            'phone_number', c.phone_number
+        ) AS candidate
+    FROM resumes r
+    JOIN candidates c ON c.id = r.candidate_id
+    CROSS JOIN search
+    WHERE r.resume_tsv @@ search.query
+    ORDER BY score DESC
+    LIMIT max_results;
+$$;
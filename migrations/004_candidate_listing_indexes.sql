@@ -0,0 +1,22 @@
+-- migrations/004_candidate_listing_indexes.sql
+--
+-- Indexes for the filters and ordering used by GET /api/candidates, so page
+-- requests become index scans instead of sequential scans as the tables grow.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- category filter on resumes
+CREATE INDEX IF NOT EXISTS idx_resumes_category
+    ON resumes (category);
+
+-- resumes -> candidates join (foreign keys are not indexed automatically)
+CREATE INDEX IF NOT EXISTS idx_resumes_candidate_id
+    ON resumes (candidate_id);
+
+-- ORDER BY created_at DESC on the unfiltered listing
+CREATE INDEX IF NOT EXISTS idx_candidates_created_at
+    ON candidates (created_at DESC);
+
+-- full_name ILIKE '%term%' search
+CREATE INDEX IF NOT EXISTS idx_candidates_full_name_trgm
+    ON candidates USING gin (full_name gin_trgm_ops);
@@ -0,0 +1,52 @@
+-- migrations/005_rank_resumes_per_keyword.sql
+--
+-- Switches the full-text column to the 'simple' configuration (no stemming or
+-- stop words, so "java" does not also match "javas" and short skills such as
+-- "go" are kept) and scores each keyword separately, summing the per-keyword
+-- ranks. A resume mentioning three of the keywords now outranks one that
+-- repeats a single keyword.
+
+ALTER TABLE resumes DROP COLUMN IF EXISTS resume_tsv;
+
+ALTER TABLE resumes
+    ADD COLUMN resume_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', coalesce(resume_text, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_resumes_resume_tsv
+    ON resumes USING gin (resume_tsv);
+
+CREATE OR REPLACE FUNCTION rank_resumes(keywords text[], max_results int)
+RETURNS TABLE (score real, pdf_url text, candidate jsonb)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH queries AS (
+        SELECT phraseto_tsquery('simple', kw) AS query
+        FROM unnest(keywords) AS kw
+    ),
+    search AS (
+        -- OR of all keyword queries, used to find candidates via the index.
+        SELECT string_agg('(' || query::text || ')', ' | ')
+                   FILTER (WHERE numnode(query) > 0)::tsquery AS query
+        FROM queries
+    )
+    SELECT
+        ranked.score,
+        r.pdf_url,
+        jsonb_build_object(
+            'id', c.id,
+            'full_name', c.full_name,
+            'email', c.email,
+            'phone_number', c.phone_number
+        ) AS candidate
+    FROM resumes r
+    JOIN candidates c ON c.id = r.candidate_id
+    CROSS JOIN search
+    CROSS JOIN LATERAL (
+        SELECT sum(ts_rank_cd(r.resume_tsv, q.query))::real AS score
+        FROM queries q
+    ) AS ranked
+    WHERE r.resume_tsv @@ search.query
+    ORDER BY ranked.score DESC
+    LIMIT max_results;
+$$;
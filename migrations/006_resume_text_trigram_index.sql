@@ -0,0 +1,12 @@
+-- migrations/006_resume_text_trigram_index.sql
+--
+-- The Python scorer only fetches resumes containing at least one keyword,
+-- using `resume_text_lower LIKE '%keyword%'` filters. A trigram index lets
+-- Postgres answer those substring filters without scanning every resume.
+-- Requires migration 002 (resume_text_lower) and the pg_trgm extension
+-- enabled by 004.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_resumes_resume_text_lower_trgm
+    ON resumes USING gin (resume_text_lower gin_trgm_ops);
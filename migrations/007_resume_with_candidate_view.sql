@@ -0,0 +1,22 @@
+-- migrations/007_resume_with_candidate_view.sql
+--
+-- Flat, pre-joined view of resumes and their candidates for the category
+-- filter of GET /api/candidates. Filtering on full_name here restricts the
+-- rows themselves, whereas a filter on an embedded candidates(...) resource
+-- only nulls out the embedded object. The view runs with the caller's
+-- permissions so row level security on both tables still applies.
+
+CREATE OR REPLACE VIEW resume_with_candidate
+WITH (security_invoker = true) AS
+SELECT
+    r.id AS resume_id,
+    r.category,
+    r.pdf_url,
+    r.created_at AS resume_created_at,
+    c.id AS candidate_id,
+    c.full_name,
+    c.email,
+    c.phone_number,
+    c.created_at AS candidate_created_at
+FROM resumes r
+JOIN candidates c ON c.id = r.candidate_id;
@@ -0,0 +1,57 @@
+-- migrations/008_candidates_by_category.sql
+--
+-- Server-side pagination for the category filter of GET /api/candidates.
+-- Candidates with several resumes in a category are collapsed to their most
+-- recent one in Postgres, so only the requested page is transferred instead
+-- of every matching resume. Requires the view from migration 007.
+
+CREATE OR REPLACE FUNCTION candidates_by_category(
+    category_filter text,
+    search_term text,
+    page_offset int,
+    page_limit int
+)
+RETURNS TABLE (candidate jsonb)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'id', latest.candidate_id,
+        'full_name', latest.full_name,
+        'email', latest.email,
+        'phone_number', latest.phone_number,
+        'created_at', latest.candidate_created_at,
+        'resumes', jsonb_build_array(
+            jsonb_build_object(
+                'id', latest.resume_id,
+                'category', latest.category,
+                'pdf_url', latest.pdf_url,
+                'created_at', latest.resume_created_at
+            )
+        )
+    ) AS candidate
+    FROM (
+        SELECT DISTINCT ON (rc.candidate_id) rc.*
+        FROM resume_with_candidate rc
+        WHERE rc.category = category_filter
+          AND (search_term IS NULL OR rc.full_name ILIKE '%' || search_term || '%')
+        ORDER BY rc.candidate_id, rc.resume_created_at DESC
+    ) AS latest
+    ORDER BY latest.candidate_created_at DESC, latest.candidate_id
+    OFFSET page_offset
+    LIMIT page_limit;
+$$;
+
+CREATE OR REPLACE FUNCTION count_candidates_by_category(
+    category_filter text,
+    search_term text
+)
+RETURNS bigint
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT count(DISTINCT rc.candidate_id)
+    FROM resume_with_candidate rc
+    WHERE rc.category = category_filter
+      AND (search_term IS NULL OR rc.full_name ILIKE '%' || search_term || '%');
+$$;
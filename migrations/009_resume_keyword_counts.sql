@@ -0,0 +1,110 @@
+-- migrations/009_resume_keyword_counts.sql
+--
+-- Precomputed keyword occurrence counts for a fixed skills vocabulary, used
+-- by the RANKING_BACKEND=counts ranking. Counts match the in-process scorer:
+-- non-overlapping occurrences in resume_text_lower. Requires migration 002,
+-- and 006 for fast lookups of keywords outside the vocabulary.
+
+CREATE TABLE IF NOT EXISTS skill_keywords (
+    keyword text PRIMARY KEY CHECK (keyword = lower(keyword) AND length(keyword) >= 2)
+);
+
+-- Starter vocabulary; extend it with the skills recruiters search for most.
+INSERT INTO skill_keywords (keyword) VALUES
+    ('python'), ('java'), ('javascript'), ('sql'), ('excel'), ('aws'),
+    ('azure'), ('docker'), ('kubernetes'), ('react'), ('linux'), ('git'),
+    ('machine learning'), ('data analysis'), ('project management'),
+    ('marketing'), ('sales'), ('accounting'), ('recruiting'), ('leadership'),
+    ('communication'), ('customer service')
+ON CONFLICT (keyword) DO NOTHING;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS resume_keyword_counts AS
+SELECT
+    r.id AS resume_id,
+    k.keyword,
+    (length(r.resume_text_lower) - length(replace(r.resume_text_lower, k.keyword, '')))
+        / length(k.keyword) AS occurrences
+FROM resumes r
+CROSS JOIN skill_keywords k
+WHERE strpos(r.resume_text_lower, k.keyword) > 0;
+
+-- Required by REFRESH ... CONCURRENTLY, and serves the lookup by keyword.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_resume_keyword_counts_keyword_resume
+    ON resume_keyword_counts (keyword, resume_id);
+
+-- Keeps the counts current whenever resumes or the vocabulary change. The
+-- refresh runs once per statement, so bulk inserts refresh only once.
+CREATE OR REPLACE FUNCTION refresh_resume_keyword_counts()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY resume_keyword_counts;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_resumes_refresh_keyword_counts ON resumes;
+CREATE TRIGGER trg_resumes_refresh_keyword_counts
+    AFTER INSERT OR DELETE OR UPDATE OF resume_text ON resumes
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_resume_keyword_counts();
+
+DROP TRIGGER IF EXISTS trg_skill_keywords_refresh_keyword_counts ON skill_keywords;
+CREATE TRIGGER trg_skill_keywords_refresh_keyword_counts
+    AFTER INSERT OR DELETE OR UPDATE ON skill_keywords
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_resume_keyword_counts();
+
+-- Ranks resumes by the summed counts of the given keywords. Keywords in the
+-- vocabulary are read from the materialized view; any others are counted on
+-- the fly, so every keyword list is answered with the same scores.
+CREATE OR REPLACE FUNCTION rank_resumes_by_keyword_counts(keywords text[], max_results int)
+RETURNS TABLE (score bigint, pdf_url text, candidate jsonb)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH wanted AS (
+        SELECT DISTINCT lower(kw) AS keyword
+        FROM unnest(keywords) AS kw
+        WHERE length(kw) > 0
+    ),
+    counts AS (
+        SELECT c.resume_id, c.occurrences
+        FROM resume_keyword_counts c
+        JOIN wanted w ON w.keyword = c.keyword
+
+        UNION ALL
+
+        SELECT
+            r.id,
+            (length(r.resume_text_lower) - length(replace(r.resume_text_lower, w.keyword, '')))
+                / length(w.keyword)
+        FROM wanted w
+        CROSS JOIN resumes r
+        WHERE NOT EXISTS (SELECT 1 FROM skill_keywords k WHERE k.keyword = w.keyword)
+          -- LIKE with the keyword's wildcards escaped, rather than strpos(),
+          -- so the trigram index from migration 006 can be used.
+          AND r.resume_text_lower LIKE '%' || replace(replace(replace(
+                  w.keyword, '\', '\\'), '%', '\%'), '_', '\_') || '%'
+    ),
+    scores AS (
+        SELECT resume_id, sum(occurrences)::bigint AS score
+        FROM counts
+        GROUP BY resume_id
+    )
+    SELECT
+        s.score,
+        r.pdf_url,
+        jsonb_build_object(
+            'id', c.id,
+            'full_name', c.full_name,
+            'email', c.email,
+            'phone_number', c.phone_number
+        ) AS candidate
+    FROM scores s
+    JOIN resumes r ON r.id = s.resume_id
+    JOIN candidates c ON c.id = r.candidate_id
+    ORDER BY s.score DESC
+    LIMIT max_results;
+$$;
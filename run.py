@@ -3,6 +3,7 @@
 from src.cv_analyzer import create_app
 from logging import getLogger, Logger
 from flask import Flask
+from decouple import config
 
 # Create the Flask app instance using the application factory
 app: Flask = create_app()
@@ -10,7 +11,14 @@ app: Flask = create_app()
 if __name__ == "__main__":
     # Get Logger instance
     logger: Logger = getLogger(__name__)
-    logger.info("Starting development server at http://localhost:5000")
 
-    # Run the app
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    if config("FLASK_ENV", default="production") != "dev":
+        logger.warning(
+            "The built-in server is for development only. Set FLASK_ENV=dev "
+            "to use it, or run: gunicorn -c gunicorn.conf.py run:app"
+        )
+    else:
+        logger.info("Starting development server at http://localhost:5000")
+
+        # Run the app
+        app.run(host="0.0.0.0", port=5000, debug=True)
@@ -1,13 +1,14 @@
 # seed_database.py
 import os
-import time
-from typing import Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Tuple, Optional
 
 import pandas as pd
+from pandas.io.parsers import TextFileReader
 from faker import Faker
 from decouple import config
 from supabase import create_client, Client
-from postgrest import APIResponse
+from postgrest import APIResponse, ReturnMethod
 from storage3.utils import StorageException
 
 # --- 1. Constants ---
@@ -15,7 +16,10 @@ DATASET_FOLDER: str = "ResumeDataset"
 CSV_FILENAME: str = "Resume.csv"
 PDF_BASE_FOLDER: str = "data"
 STORAGE_BUCKET: str = "cv-pdfs"
-BATCH_SIZE: int = 100  # Process 100 records at a time
+CSV_COLUMNS: List[str] = ["ID", "Category", "Resume_str"]
+BATCH_SIZE: int = 500  # Rows per bulk insert call
+UPLOAD_WORKERS: int = 16  # Concurrent PDF uploads per batch
+LIST_WORKERS: int = 8  # Concurrent folder listings when clearing storage
 
 
 def initialize_clients() -> Tuple[Client, Faker]:
@@ -41,19 +45,21 @@ def clear_storage_bucket(supabase: Client):
             print("Storage bucket is already empty.")
             return
 
-        file_paths = [file["name"] for file in files_to_delete]
-
-        full_paths_to_delete = []
-        for path in file_paths:
-            is_folder = any(
-                f["name"] == path and f["id"] is None for f in files_to_delete
+        # Folders are listed without an id; everything else is a file.
+        folder_paths = [f["name"] for f in files_to_delete if f["id"] is None]
+        full_paths_to_delete = [
+            f["name"] for f in files_to_delete if f["id"] is not None
+        ]
+
+        # List every category folder concurrently instead of one at a time.
+        with ThreadPoolExecutor(max_workers=LIST_WORKERS) as executor:
+            folder_listings = executor.map(
+                lambda path: (path, supabase.storage.from_(STORAGE_BUCKET).list(path)),
+                folder_paths,
             )
-            if is_folder:
-                folder_files = supabase.storage.from_(STORAGE_BUCKET).list(path)
+            for path, folder_files in folder_listings:
                 for file in folder_files:
                     full_paths_to_delete.append(f"{path}/{file['name']}")
-            else:
-                full_paths_to_delete.append(path)
 
         if not full_paths_to_delete:
             print("No files found to delete.")
@@ -88,15 +94,23 @@ def clear_database_tables(supabase: Client):
         exit(1)
 
 
-def read_resume_data(csv_path: str) -> Optional[pd.DataFrame]:
-    """Reads the entire resume dataset from the CSV file."""
+def read_resume_data(csv_path: str) -> Optional[TextFileReader]:
+    """
+    Opens the resume dataset as a chunked reader yielding BATCH_SIZE rows at a
+    time, so only one batch of resume text is held in memory.
+    """
     if not os.path.exists(csv_path):
         print(f"CRITICAL: CSV file not found at {csv_path}.")
         return None
     try:
-        df = pd.read_csv(csv_path)
-        print(f"Successfully read {len(df)} total rows from {csv_path}.")
-        return df
+        chunk_iter = pd.read_csv(
+            csv_path,
+            chunksize=BATCH_SIZE,
+            usecols=CSV_COLUMNS,
+            dtype={"ID": "int32", "Category": "category"},
+        )
+        print(f"Opened {csv_path} for reading in batches of {BATCH_SIZE} rows.")
+        return chunk_iter
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         return None
@@ -133,66 +147,98 @@ def upload_and_get_url(
         return None
 
 
-def process_resume_row(row: pd.Series, supabase: Client, faker: Faker) -> bool:
-    """Processes a single row from the DataFrame."""
+def build_candidate_records(
+    batch_df: pd.DataFrame, faker: Faker
+) -> List[Dict[str, str]]:
+    """Generates the fake contact details for every row in a batch."""
+    # Draw all names and phone numbers up front in tight loops rather than
+    # interleaving Faker provider calls with the per-row record building.
+    batch_size: int = len(batch_df)
+    names: List[str] = [faker.name() for _ in range(batch_size)]
+    phones: List[str] = [faker.phone_number() for _ in range(batch_size)]
+
+    return [
+        {
+            "full_name": name,
+            "email": f"{name.lower().replace(' ', '.')}{index}@example.com",
+            "phone_number": phone,
+        }
+        for index, name, phone in zip(batch_df.index, names, phones)
+    ]
+
+
+def get_pdf_paths(row: pd.Series) -> Tuple[str, str]:
+    """Returns the local and storage paths of the PDF belonging to a row."""
+    category: str = row["Category"]
+    resume_id: int = row["ID"]
+    local_pdf_path: str = os.path.join(
+        DATASET_FOLDER, PDF_BASE_FOLDER, category, f"{resume_id}.pdf"
+    )
+    storage_pdf_path: str = f"{category}/{resume_id}.pdf"
+    return local_pdf_path, storage_pdf_path
+
+
+def process_resume_batch(batch_df: pd.DataFrame, supabase: Client, faker: Faker) -> int:
+    """
+    Seeds one batch of rows using a single bulk insert per table.
+    Returns the number of resumes that were inserted.
+    """
     try:
-        candidate_name: str = faker.name()
-        candidate_email: str = (
-            f"{candidate_name.lower().replace(' ', '.')}{row.name}@example.com"
+        candidate_records: List[Dict[str, str]] = build_candidate_records(
+            batch_df, faker
         )
-        candidate_phone: str = faker.phone_number()
 
         candidate_response: APIResponse = (
             supabase.table("candidates")
-            .insert(
-                {
-                    "full_name": candidate_name,
-                    "email": candidate_email,
-                    "phone_number": candidate_phone,
-                }
-            )
+            .insert(candidate_records, returning=ReturnMethod.representation)
             .execute()
         )
 
-        if not candidate_response.data:
-            print(f"Failed to insert candidate. Error: {candidate_response.error}")
-            return False
-
-        new_candidate_id: str = candidate_response.data[0]["id"]
-        print(f"Inserted candidate '{candidate_name}' with ID: {new_candidate_id}")
-
-        category: str = row["Category"]
-        resume_id: int = row["ID"]
-        local_pdf_path: str = os.path.join(
-            DATASET_FOLDER, PDF_BASE_FOLDER, category, f"{resume_id}.pdf"
-        )
-        storage_pdf_path: str = f"{category}/{resume_id}.pdf"
-
-        pdf_url = upload_and_get_url(supabase, local_pdf_path, storage_pdf_path)
+        if len(candidate_response.data) != len(candidate_records):
+            print(
+                f"Candidate insert returned {len(candidate_response.data)} rows, "
+                f"expected {len(candidate_records)}. Skipping batch."
+            )
+            return 0
+
+        # Rows come back in insertion order, so they line up with batch_df.
+        candidate_ids: List[str] = [c["id"] for c in candidate_response.data]
+        print(f"Inserted {len(candidate_ids)} candidates.")
+
+        # Uploads are network-bound, so run them concurrently. The Supabase
+        # client's HTTP session is shared across threads and pools connections.
+        pdf_urls: Dict[Any, Optional[str]] = {}
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+            future_to_index = {
+                executor.submit(
+                    upload_and_get_url, supabase, *get_pdf_paths(row)
+                ): index
+                for index, row in batch_df.iterrows()
+            }
+            for future in as_completed(future_to_index):
+                pdf_urls[future_to_index[future]] = future.result()
+
+        resume_records: List[Dict[str, Any]] = [
+            {
+                "candidate_id": candidate_id,
+                "resume_text": row["Resume_str"],
+                "pdf_url": pdf_urls[index],
+                "category": row["Category"],
+            }
+            for candidate_id, (index, row) in zip(candidate_ids, batch_df.iterrows())
+        ]
 
-        resume_text: str = row["Resume_str"]
         resume_response: APIResponse = (
             supabase.table("resumes")
-            .insert(
-                {
-                    "candidate_id": new_candidate_id,
-                    "resume_text": resume_text,
-                    "pdf_url": pdf_url,
-                    "category": category,
-                }
-            )
+            .insert(resume_records, returning=ReturnMethod.representation)
             .execute()
         )
 
-        if not resume_response.data:
-            print(f"Failed to insert resume data. Error: {resume_response.error}")
-            return False
-
-        print(f"Successfully seeded resume for candidate '{candidate_name}'.")
-        return True
+        print(f"Inserted {len(resume_response.data)} resumes.")
+        return len(resume_response.data)
     except Exception as e:
-        print(f"An unexpected error occurred on row {row.name}: {e}")
-        return False
+        print(f"An unexpected error occurred while seeding the batch: {e}")
+        return 0
 
 
 def main():
@@ -205,35 +251,30 @@ def main():
     clear_storage_bucket(supabase)
     clear_database_tables(supabase)
 
-    # --- Read ALL data from the CSV ---
+    # --- Stream the CSV in batches ---
     csv_path = os.path.join(DATASET_FOLDER, CSV_FILENAME)
-    df = read_resume_data(csv_path)
+    chunk_iter = read_resume_data(csv_path)
 
-    if df is None:
+    if chunk_iter is None:
         print("--- Seeding Aborted ---")
         return
 
     successful_seeds: int = 0
-    total_rows: int = len(df)
-    # Calculate the total number of batches needed
-    num_batches: int = (total_rows + BATCH_SIZE - 1) // BATCH_SIZE
-
-    print(f"\n--- Starting to seed {total_rows} records in {num_batches} batches ---")
-
-    # --- Loop through the DataFrame in batches ---
-    for i in range(num_batches):
-        print(f"\n--- Processing Batch {i + 1}/{num_batches} ---")
+    total_rows: int = 0
 
-        start_index = i * BATCH_SIZE
-        end_index = min((i + 1) * BATCH_SIZE, total_rows)
+    print(f"\n--- Starting to seed records in batches of {BATCH_SIZE} ---")
 
-        batch_df = df.iloc[start_index:end_index]
-
-        for index, row in batch_df.iterrows():
-            print(f"\n--- Processing record {index + 1}/{total_rows} ---")
-            if process_resume_row(row, supabase, faker):
-                successful_seeds += 1
-            time.sleep(0.05)
+    # --- Loop through the CSV one chunk at a time ---
+    try:
+        with chunk_iter:
+            for i, batch_df in enumerate(chunk_iter):
+                print(f"\n--- Processing Batch {i + 1} ({len(batch_df)} rows) ---")
+                total_rows += len(batch_df)
+                successful_seeds += process_resume_batch(batch_df, supabase, faker)
+    except Exception as e:
+        print(f"Error reading CSV file: {e}")
+        print("--- Seeding Aborted ---")
+        return
 
     print("\n--- Seeding Complete ---")
     print(f"Total rows processed: {total_rows}")
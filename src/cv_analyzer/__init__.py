@@ -1,22 +1,55 @@
 # src/cv_analyzer/__init__.py
 
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from logging import StreamHandler
 import os
+import queue
+import httpx
 from flask import Flask
+from flask.logging import default_handler
 from flask_cors import CORS
-from decouple import config
+from decouple import config as env_config
 from supabase import create_client, Client
 
+from .config import Config
+from .json_provider import OrjsonProvider
 from .routes import api_bp
 
 
+def _use_pooled_http_sessions(supabase: Client) -> None:
+    """
+    Swaps the PostgREST and Storage HTTP sessions for clients that keep idle
+    connections alive longer, so requests reuse warm TCP/TLS connections
+    instead of re-handshaking after short idle gaps.
+    """
+    limits = httpx.Limits(
+        max_keepalive_connections=20, max_connections=40, keepalive_expiry=60
+    )
+    for sub_client in (supabase.postgrest, supabase.storage):
+        default_session: httpx.Client = sub_client.session
+        sub_client.session = httpx.Client(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            timeout=default_session.timeout,
+            follow_redirects=True,
+            http2=True,
+            limits=limits,
+        )
+        default_session.close()
+
+    # The storage client hands its session to each bucket proxy via _client.
+    supabase.storage._client = supabase.storage.session
+
+
 def create_app(config_class=None) -> Flask:
     """
     Application factory function to create and configure the Flask app.
     """
     app = Flask(__name__)
+    app.config.from_object(config_class or Config)
+    app.json = OrjsonProvider(app)
 
     # --- 1. Configure Logging ---
     logs_dir = "logs"
@@ -36,18 +69,31 @@ def create_app(config_class=None) -> Flask:
     stream_handler.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
     stream_handler.setLevel(logging.INFO)
 
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(stream_handler)
+    # Request threads only enqueue records; a background listener thread does
+    # the actual console and file I/O.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    log_listener = QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
+    # Flask attaches its own stderr handler on first access of app.logger;
+    # it would write synchronously on request threads and duplicate console
+    # lines, so the queue handler replaces it.
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(QueueHandler(log_queue))
     app.logger.setLevel(logging.INFO)
 
     app.logger.info("CV Analyzer backend starting up...")
 
     # --- 2. Initialize Supabase Client ---
     try:
-        url: str = config("SUPABASE_URL")
-        key: str = config("SUPABASE_KEY")
+        url: str = env_config("SUPABASE_URL")
+        key: str = env_config("SUPABASE_KEY")
 
         supabase: Client = create_client(url, key)
+        _use_pooled_http_sessions(supabase)
         app.supabase = supabase
 
         app.logger.info("Supabase client initialized successfully.")
@@ -0,0 +1,17 @@
+# src/cv_analyzer/config.py
+
+from decouple import config
+
+
+class Config:
+    """
+    Default application settings, read from the environment or `.env` file.
+    """
+
+    # How /api/analyze ranks resumes:
+    #   "python"   - fetch resume text and count keyword occurrences in-process.
+    #   "postgres" - rank server-side with the rank_resumes() full-text search
+    #                function (requires the SQL files in migrations/).
+    #   "counts"   - rank server-side by keyword counts, precomputed for the
+    #                skills vocabulary (requires migration 009).
+    RANKING_BACKEND: str = config("RANKING_BACKEND", default="python")
@@ -0,0 +1,20 @@
+# src/cv_analyzer/json_provider.py
+
+from typing import Any, Union
+
+import orjson
+from flask.json.provider import JSONProvider
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson, which serializes the nested
+    candidate/resume payloads several times faster than the stdlib encoder.
+    Used by `jsonify` and `request.get_json` once set as `app.json`.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
@@ -1,9 +1,17 @@
 # src/cv_analyzer/routes.py
 
 import logging
-from flask import Blueprint, request, jsonify, current_app
+import orjson
+from flask import (
+    Blueprint,
+    Response,
+    request,
+    jsonify,
+    current_app,
+    stream_with_context,
+)
 from pydantic import BaseModel, ValidationError, Field
-from typing import List
+from typing import Any, Dict, Iterator, List, Tuple
 
 from . import services
 
@@ -14,6 +22,49 @@ class AnalyzeRequest(BaseModel):
     limit: int = Field(default=5, gt=0, le=100)
 
 
+MIN_KEYWORD_LENGTH: int = 2
+
+
+def normalize_keywords(raw_keywords: List[str]) -> Tuple[str, ...]:
+    """
+    Lowercases keywords and drops duplicates (keeping the original order) and
+    entries shorter than MIN_KEYWORD_LENGTH, so the scorer never searches for
+    the same needle twice.
+    """
+    lowered = (kw.strip().lower() for kw in raw_keywords)
+    return tuple(dict.fromkeys(kw for kw in lowered if len(kw) >= MIN_KEYWORD_LENGTH))
+
+
+def _error_details(error: ValidationError) -> List[Dict[str, Any]]:
+    """
+    Returns the validation errors for the response body. A `json_invalid`
+    error carries the raw request bytes as its input, which are decoded so
+    the details stay JSON-serializable.
+    """
+    return [
+        (
+            {**details, "input": details["input"].decode("utf-8", "replace")}
+            if isinstance(details.get("input"), bytes)
+            else details
+        )
+        for details in error.errors()
+    ]
+
+
+def _stream_ranked_matches(matches: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Yields the `{"matches": [...]}` response body one match at a time, so the
+    client can start parsing before the whole list has been serialized.
+    """
+    yield b'{"matches":['
+    for i, match in enumerate(matches):
+        if i:
+            yield b","
+        # Matches may be shared with the service cache, so copy before ranking.
+        yield orjson.dumps({**match, "rank": i + 1}, option=orjson.OPT_NON_STR_KEYS)
+    yield b"]}"
+
+
 # --- Blueprint ---
 api_bp: Blueprint = Blueprint("api_bp", __name__)
 
@@ -26,28 +77,47 @@ def analyze_resumes():
     logger.info("Received request for /api/analyze")
 
     try:
-        json_data = request.get_json()
-        if not json_data:
+        if not request.is_json:
             return jsonify({"error": "Request body must be JSON"}), 400
 
-        validated_data = AnalyzeRequest(**json_data)
-        keywords = [kw.lower() for kw in validated_data.keywords]
+        # Parse and validate in one step inside pydantic-core.
+        validated_data = AnalyzeRequest.model_validate_json(request.get_data())
+        keywords = normalize_keywords(validated_data.keywords)
         limit = validated_data.limit
         logger.info(
             f"Analysis request validated for keywords: {keywords}, limit: {limit}"
         )
 
     except ValidationError as e:
-        return jsonify({"error": "Invalid request body", "details": e.errors()}), 400
+        return (
+            jsonify({"error": "Invalid request body", "details": _error_details(e)}),
+            400,
+        )
+
+    if not keywords:
+        return jsonify({"matches": []}), 200
 
     try:
-        matches = services.get_ranked_resume_matches(keywords, current_app.supabase)
-        limited_matches = matches[:limit]
-        final_response = []
-        for i, match in enumerate(limited_matches):
-            match["rank"] = i + 1
-            final_response.append(match)
-        return jsonify({"matches": final_response}), 200
+        ranking_backend = current_app.config["RANKING_BACKEND"]
+        if ranking_backend == "postgres":
+            matches = services.get_ranked_resume_matches_db(
+                keywords, current_app.supabase, limit
+            )
+        elif ranking_backend == "counts":
+            matches = services.get_ranked_resume_matches_counts(
+                keywords, current_app.supabase, limit
+            )
+        else:
+            matches = services.get_ranked_resume_matches(
+                keywords, current_app.supabase, limit
+            )
+        return (
+            Response(
+                stream_with_context(_stream_ranked_matches(matches)),
+                mimetype="application/json",
+            ),
+            200,
+        )
     except Exception as e:
         logger.exception("An error occurred during the analysis process.")
         return jsonify({"error": "An internal error occurred during analysis."}), 500
@@ -90,3 +160,25 @@ def get_all_candidates():
     except Exception as e:
         logger.exception("An error occurred while fetching candidates.")
         return jsonify({"error": "An internal error occurred."}), 500
+
+
+@api_bp.route("/resumes/<int:resume_id>/text", methods=["GET"])
+def get_resume_text(resume_id: int):
+    """
+    Returns the full text of one resume, for detail views of a candidate
+    from the listing.
+    """
+    logger: logging.Logger = logging.getLogger(__name__)
+    logger.info(f"Received request for /api/resumes/{resume_id}/text")
+
+    try:
+        resume_text = services.get_resume_text(current_app.supabase, resume_id)
+
+        if resume_text is None:
+            return jsonify({"error": "Resume not found."}), 404
+
+        return jsonify({"id": resume_id, "resume_text": resume_text}), 200
+
+    except Exception as e:
+        logger.exception("An error occurred while fetching the resume text.")
+        return jsonify({"error": "An internal error occurred."}), 500
@@ -1,68 +1,292 @@
 # src/cv_analyzer/services.py
 
+import heapq
 import logging
-from typing import List, Dict, Any, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from urllib.parse import quote
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
+from cachetools import TTLCache, cached
 from supabase import Client
 
+from .scoring import build_keyword_counter
+
+# Ranked results per normalized keyword set. The resume corpus changes rarely,
+# so repeated queries within the TTL skip the fetch and scoring entirely.
+# Concurrent misses for the same key wait on the condition for the first
+# caller's result instead of each fetching and scoring the resumes again.
+MATCH_CACHE_TTL_SECONDS: int = 300
+_match_cache: TTLCache = TTLCache(maxsize=256, ttl=MATCH_CACHE_TTL_SECONDS)
+_match_cache_lock = threading.Condition()
+
+# Candidate listing pages per (page, limit, search, category). The first page
+# of the unfiltered listing is requested constantly by the UI; a short TTL
+# keeps newly added candidates visible quickly.
+CANDIDATE_CACHE_TTL_SECONDS: int = 30
+_candidate_cache: TTLCache = TTLCache(maxsize=512, ttl=CANDIDATE_CACHE_TTL_SECONDS)
+_candidate_cache_lock = threading.Condition()
+
+# Upper bound on resumes scored per request, fetched in batches of
+# RESUME_BATCH_SIZE.
+MAX_SCANNED_RESUMES: int = 3000
+RESUME_BATCH_SIZE: int = 500
+
+# The keyword prefilter travels in the query string of every batch request.
+# Past this URL-encoded length the request would risk a 414 from the gateway,
+# so resumes are scanned unfiltered and the scorer drops the non-matches.
+MAX_KEYWORD_FILTER_LENGTH: int = 4096
+
+# Runs independent Supabase queries concurrently with the calling request
+# thread. The client's HTTP session is thread-safe and pools connections.
+_query_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="supabase")
+
+
+def clear_match_cache() -> None:
+    """Drops all cached ranking results, e.g. after resumes were re-seeded."""
+    with _match_cache_lock:
+        _match_cache.clear()
+
+
+def clear_candidate_cache() -> None:
+    """Drops all cached candidate listing pages, e.g. after re-seeding."""
+    with _candidate_cache_lock:
+        _candidate_cache.clear()
+
 
 def get_ranked_resume_matches(
-    keywords: List[str], supabase: Client
+    keywords: Sequence[str], supabase: Client, limit: int
 ) -> List[Dict[str, Any]]:
     """
-    Core business logic to fetch, score, and rank resumes against keywords.
+    Core business logic to fetch, score, and rank resumes against keywords,
+    returning the `limit` best matches.
+    Results are cached per keyword set and limit; callers must not mutate them.
     """
+    return _top_matches(tuple(sorted(set(keywords))), supabase, limit)
+
+
+@cached(
+    _match_cache,
+    key=lambda keywords, supabase, limit: (keywords, limit),
+    condition=_match_cache_lock,
+)
+def _top_matches(
+    keywords: Tuple[str, ...], supabase: Client, limit: int
+) -> List[Dict[str, Any]]:
     logger: logging.Logger = logging.getLogger(__name__)
 
-    response = (
-        supabase.table("resumes")
-        .select("resume_text, pdf_url, candidates(id, full_name, email, phone_number)")
-        .limit(3000)
+    if not keywords:
+        return []
+
+    # Keep only a heap of `limit` entries instead of sorting every match. The
+    # resumes are scored batch by batch, so resume text is only held for the
+    # current and the prefetched batch.
+    top_resumes = heapq.nlargest(
+        limit,
+        _iter_scored(_iter_matching_resumes(supabase, keywords), keywords),
+        key=itemgetter(0),
+    )
+
+    if not top_resumes:
+        logger.info("No matches found for the given keywords.")
+        return []
+
+    candidate_ids = list({candidate_id for _, candidate_id, _ in top_resumes})
+    candidates_response = (
+        supabase.table("candidates")
+        .select("id, full_name, email, phone_number")
+        .in_("id", candidate_ids)
         .execute()
     )
+    candidates_by_id = {c["id"]: c for c in candidates_response.data}
 
-    if not response.data:
-        logger.warning("No resumes found in the database to analyze.")
+    top_matches = [
+        {
+            "score": score,
+            "candidate": candidates_by_id[candidate_id],
+            "resume": {"pdf_url": pdf_url},
+        }
+        for score, candidate_id, pdf_url in top_resumes
+        if candidate_id in candidates_by_id
+    ]
+
+    if not top_matches:
+        logger.info("No candidates found for the matching resumes.")
         return []
 
-    logger.info(f"Successfully fetched {len(response.data)} resumes for analysis.")
+    logger.info(
+        f"Returning {len(top_matches)} matches. Top score: {top_matches[0]['score']}"
+    )
 
-    scored_matches = []
-    for resume_data in response.data:
-        score = 0
-        resume_text_lower = (resume_data.get("resume_text") or "").lower()
+    return top_matches
 
-        for keyword in keywords:
-            score += resume_text_lower.count(keyword)
 
-        if score > 0:
-            candidate_info = resume_data.get("candidates")
-            if candidate_info:
-                scored_matches.append(
-                    {
-                        "score": score,
-                        "candidate": candidate_info,
-                        "resume": {"pdf_url": resume_data.get("pdf_url")},
-                    }
-                )
+def _iter_matching_resumes(
+    supabase: Client, keywords: Sequence[str]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields up to MAX_SCANNED_RESUMES resumes containing any of the keywords,
+    fetched in keyset-paginated batches ordered by id. The next batch is
+    requested in the background while the caller scores the current one.
+    Keyword sets too long to filter on in the URL yield every resume.
+    """
+    logger: logging.Logger = logging.getLogger(__name__)
+
+    # Resumes without any keyword would score 0, so Postgres filters them out
+    # before the text is transferred. Candidate details are not joined here;
+    # only the top matches need them.
+    query_filter: Optional[str] = _contains_any_filter("resume_text_lower", keywords)
+    if len(quote(query_filter, safe="")) > MAX_KEYWORD_FILTER_LENGTH:
+        logger.info(
+            f"Keyword filter for {len(keywords)} keywords is too long for the "
+            "URL; scanning resumes unfiltered."
+        )
+        query_filter = None
+
+    def fetch_batch(last_id: Any, batch_size: int) -> List[Dict[str, Any]]:
+        query = supabase.table("resumes").select(
+            "id, candidate_id, resume_text_lower, pdf_url"
+        )
+        if query_filter is not None:
+            query = query.or_(query_filter)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        return query.order("id").limit(batch_size).execute().data or []
 
-    if not scored_matches:
+    fetched = 0
+    batch_size = min(RESUME_BATCH_SIZE, MAX_SCANNED_RESUMES)
+    batch = fetch_batch(None, batch_size)
+
+    while batch:
+        fetched += len(batch)
+        next_batch_size = min(RESUME_BATCH_SIZE, MAX_SCANNED_RESUMES - fetched)
+
+        # A short batch means the matches are exhausted.
+        next_batch = None
+        if len(batch) == batch_size and next_batch_size > 0:
+            next_batch = _query_executor.submit(
+                fetch_batch, batch[-1]["id"], next_batch_size
+            )
+
+        yield from batch
+
+        if next_batch is None:
+            break
+        batch, batch_size = next_batch.result(), next_batch_size
+
+    if fetched:
+        logger.info(f"Successfully fetched {fetched} resumes for analysis.")
+    else:
+        logger.info("No resumes contain any of the given keywords.")
+
+
+def _contains_any_filter(column: str, keywords: Sequence[str]) -> str:
+    """
+    Builds a PostgREST `or` filter matching rows where `column` contains any
+    of the keywords as a substring. Keywords containing `*` may match a few
+    extra rows; the scorer counts those exactly afterwards.
+    """
+    conditions = []
+    for keyword in keywords:
+        # Escape LIKE wildcards first, then quote the value for PostgREST so
+        # commas and parentheses in keywords such as "c++, c#" stay literal.
+        # PostgREST turns every `*` into `%` and has no escape for it, so a
+        # literal `*` is relaxed to the single-character wildcard `_`.
+        pattern = (
+            keyword.replace("\\", "\\\\")
+            .replace("%", "\\%")
+            .replace("_", "\\_")
+            .replace("*", "_")
+        )
+        quoted = pattern.replace("\\", "\\\\").replace('"', '\\"')
+        conditions.append(f'{column}.like."%{quoted}%"')
+    return ",".join(conditions)
+
+
+def _iter_scored(
+    resumes: Iterable[Dict[str, Any]], keywords: Sequence[str]
+) -> Iterator[Tuple[int, Any, Any]]:
+    """
+    Yields a (score, candidate_id, pdf_url) tuple for every resume with at
+    least one keyword hit. Match dicts are only built for the final top
+    results.
+    """
+    count_keywords = build_keyword_counter(keywords)
+
+    for resume_data in resumes:
+        score = count_keywords(resume_data.get("resume_text_lower") or "")
+        candidate_id = resume_data.get("candidate_id")
+
+        if score and candidate_id:
+            yield score, candidate_id, resume_data.get("pdf_url")
+
+
+def get_ranked_resume_matches_db(
+    keywords: Sequence[str], supabase: Client, limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Ranks resumes inside Postgres using the rank_resumes() full-text search
+    function, so only the top `limit` matches are transferred.
+    """
+    return _rank_with_rpc("rank_resumes", keywords, supabase, limit)
+
+
+def get_ranked_resume_matches_counts(
+    keywords: Sequence[str], supabase: Client, limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Ranks resumes by keyword occurrence counts inside Postgres, reading the
+    precomputed resume_keyword_counts materialized view for keywords in the
+    skills vocabulary. Scores match the in-process scorer.
+    """
+    return _rank_with_rpc("rank_resumes_by_keyword_counts", keywords, supabase, limit)
+
+
+def _rank_with_rpc(
+    function: str, keywords: Sequence[str], supabase: Client, limit: int
+) -> List[Dict[str, Any]]:
+    logger: logging.Logger = logging.getLogger(__name__)
+
+    response = supabase.rpc(
+        function, {"keywords": list(keywords), "max_results": limit}
+    ).execute()
+
+    if not response.data:
         logger.info("No matches found for the given keywords.")
         return []
 
-    sorted_matches = sorted(scored_matches, key=lambda x: x["score"], reverse=True)
+    matches = [
+        {
+            "score": row["score"],
+            "candidate": row["candidate"],
+            "resume": {"pdf_url": row["pdf_url"]},
+        }
+        for row in response.data
+    ]
 
-    logger.info(
-        f"Found {len(sorted_matches)} matches. Top score: {sorted_matches[0]['score']}"
-    )
+    logger.info(f"Found {len(matches)} matches. Top score: {matches[0]['score']}")
 
-    return sorted_matches
+    return matches
 
 
+@cached(
+    _candidate_cache,
+    key=lambda supabase, page, limit, search_term, category: (
+        page,
+        limit,
+        search_term,
+        category,
+    ),
+    condition=_candidate_cache_lock,
+)
 def get_paginated_candidates(
     supabase: Client, page: int, limit: int, search_term: str, category: str
 ) -> Tuple[List[Dict[str, Any]], int]:
     """
     Fetches a paginated, searchable, and filterable list of all candidates.
+    Only the columns the listing needs are selected; full resume text is left
+    out since it is by far the largest column.
+    Pages are cached for CANDIDATE_CACHE_TTL_SECONDS; callers must not mutate them.
     """
     logger: logging.Logger = logging.getLogger(__name__)
     logger.info(
@@ -75,83 +299,78 @@ def get_paginated_candidates(
     if category != "all":
         logger.info(f"Applying category filter for: '{category}'")
 
-        # Query resumes table with category filter, then join candidates
-        query = (
-            supabase.table("resumes")
-            .select(
-                "id, category, pdf_url, resume_text, created_at, candidates(id, full_name, email, phone_number, created_at)"
-            )
-            .eq("category", category)
-        )
+        # Deduplication and pagination happen in Postgres (migration 008),
+        # so only the requested page of unique candidates is transferred.
+        params = {"category_filter": category, "search_term": None}
 
         # Apply search if provided
         if search_term and search_term.strip():
             logger.info(f"Applying search filter for: '{search_term}'")
-            query = query.ilike("candidates.full_name", f"%{search_term}%")
+            params["search_term"] = search_term
 
-        # Get ALL results first (without pagination) to count unique candidates
-        all_response = query.execute()
+        # The count and the page are independent, so both run at once.
+        count_future = _query_executor.submit(
+            supabase.rpc("count_candidates_by_category", params).execute
+        )
+        page_response = supabase.rpc(
+            "candidates_by_category",
+            {**params, "page_offset": offset, "page_limit": limit},
+        ).execute()
+        total_count = count_future.result().data or 0
 
-        if not all_response.data:
+        if not total_count:
             return [], 0
 
-        # Count unique candidates
-        unique_candidate_ids = set()
-        all_candidates = []
-
-        for item in all_response.data:
-            candidate_data = item.get("candidates", {})
-            if candidate_data:
-                candidate_id = candidate_data.get("id")
-                if candidate_id not in unique_candidate_ids:
-                    unique_candidate_ids.add(candidate_id)
-                    all_candidates.append(
-                        {
-                            "id": candidate_data.get("id"),
-                            "full_name": candidate_data.get("full_name"),
-                            "email": candidate_data.get("email"),
-                            "phone_number": candidate_data.get("phone_number"),
-                            "created_at": candidate_data.get("created_at"),
-                            "resumes": [
-                                {
-                                    "id": item.get("id"),
-                                    "category": item.get("category"),
-                                    "pdf_url": item.get("pdf_url"),
-                                    "resume_text": item.get("resume_text"),
-                                    "created_at": item.get("created_at"),
-                                }
-                            ],
-                        }
-                    )
-
-        # Now apply pagination to unique candidates
-        total_count = len(all_candidates)
-        candidates = all_candidates[offset : offset + limit]
+        candidates = [row["candidate"] for row in page_response.data or []]
 
     else:
-        # Query candidates table normally
+        # Query candidates table normally. The exact total is fetched with a
+        # separate HEAD request so it can run alongside the page query.
         query = supabase.table("candidates").select(
-            "id, full_name, email, phone_number, created_at, resumes(id, category, pdf_url, resume_text, created_at)",
-            count="exact",
+            "id, full_name, email, phone_number, created_at, resumes(id, category, pdf_url, created_at)"
+        )
+        count_query = supabase.table("candidates").select(
+            "id", count="exact", head=True
         )
 
         # Apply search if provided
         if search_term and search_term.strip():
             logger.info(f"Applying search filter for: '{search_term}'")
             query = query.ilike("full_name", f"%{search_term}%")
+            count_query = count_query.ilike("full_name", f"%{search_term}%")
 
         # Apply pagination and ordering
         query = query.range(offset, offset + limit - 1).order("created_at", desc=True)
 
+        count_future = _query_executor.submit(count_query.execute)
         response = query.execute()
+        total_count = count_future.result().count or 0
 
         if not response.data:
             return [], 0
 
-        total_count = response.count or 0
         candidates = response.data
 
     logger.info(
         f"Fetched {len(candidates)} candidates for page {page} with total count {total_count}."
     )
     return candidates, total_count
+
+
+def get_resume_text(supabase: Client, resume_id: int) -> Optional[str]:
+    """
+    Fetches the full text of a single resume, which the candidate listing
+    leaves out. Returns None if no resume has the given id.
+    """
+    response = (
+        supabase.table("resumes")
+        .select("resume_text")
+        .eq("id", resume_id)
+        .limit(1)
+        .execute()
+    )
+
+    if not response.data:
+        return None
+
+    return response.data[0]["resume_text"]
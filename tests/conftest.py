@@ -0,0 +1,24 @@
+# tests/conftest.py
+
+import pytest
+
+from src.cv_analyzer import create_app
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    # create_app writes logs/ relative to the working directory and builds a
+    # Supabase client from the environment; no request is sent until a query
+    # runs, and tests replace app.supabase before that.
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_KEY", "test-key")
+    monkeypatch.setenv("RANKING_BACKEND", "python")
+    app = create_app()
+    app.supabase = object()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,21 @@
+# tests/test_json_provider.py
+
+from flask import jsonify
+
+from src.cv_analyzer.json_provider import OrjsonProvider
+
+
+def test_create_app_uses_orjson_provider(app):
+    assert isinstance(app.json, OrjsonProvider)
+
+
+def test_jsonify_accepts_non_str_keys(app):
+    with app.app_context():
+        response = jsonify({1: "one", "two": [2, 3]})
+
+    assert response.mimetype == "application/json"
+    assert response.get_json() == {"1": "one", "two": [2, 3]}
+
+
+def test_loads_accepts_str_and_bytes(app):
+    assert app.json.loads('{"a": 1}') == app.json.loads(b'{"a": 1}') == {"a": 1}
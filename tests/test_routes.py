@@ -0,0 +1,130 @@
+# tests/test_routes.py
+
+import copy
+import json
+
+import pytest
+
+from src.cv_analyzer import services
+from src.cv_analyzer.routes import MIN_KEYWORD_LENGTH, normalize_keywords
+
+
+def test_normalize_keywords_lowercases_and_strips():
+    assert normalize_keywords(["  Python ", "SQL"]) == ("python", "sql")
+
+
+def test_normalize_keywords_drops_duplicates_keeping_first_order():
+    assert normalize_keywords(["Java", "python", "JAVA ", "Python"]) == (
+        "java",
+        "python",
+    )
+
+
+def test_normalize_keywords_drops_short_and_blank_entries():
+    short = "x" * (MIN_KEYWORD_LENGTH - 1)
+    assert normalize_keywords([short, "", "   ", "go"]) == ("go",)
+
+
+def test_normalize_keywords_empty_input():
+    assert normalize_keywords([]) == ()
+
+
+@pytest.fixture
+def resume_texts(monkeypatch):
+    monkeypatch.setattr(
+        services,
+        "get_resume_text",
+        lambda supabase, resume_id: {7: "python developer"}.get(resume_id),
+    )
+
+
+def test_get_resume_text_returns_text(client, resume_texts):
+    response = client.get("/api/resumes/7/text")
+
+    assert response.status_code == 200
+    assert response.json == {"id": 7, "resume_text": "python developer"}
+
+
+@pytest.mark.parametrize("path", ["/api/resumes/8/text", "/api/resumes/abc/text"])
+def test_get_resume_text_not_found(client, resume_texts, path):
+    assert client.get(path).status_code == 404
+
+
+def test_analyze_rejects_non_json_body(client):
+    response = client.post("/api/analyze", data="python", content_type="text/plain")
+
+    assert response.status_code == 400
+    assert response.json == {"error": "Request body must be JSON"}
+
+
+def test_analyze_reports_invalid_json(client):
+    response = client.post(
+        "/api/analyze", data=b'{"keywords": [', content_type="application/json"
+    )
+
+    assert response.status_code == 400
+    (details,) = response.json["details"]
+    assert details["type"] == "json_invalid"
+    assert details["input"] == '{"keywords": ['
+
+
+def test_analyze_reports_invalid_fields(client):
+    response = client.post("/api/analyze", json={"keywords": ["python"], "limit": 0})
+
+    assert response.status_code == 400
+    (details,) = response.json["details"]
+    assert details["loc"] == ["limit"]
+    assert details["input"] == 0
+
+
+@pytest.fixture
+def ranked_matches(monkeypatch):
+    matches = [
+        {"score": 3, "candidate": {"id": 1}, "resume": {"pdf_url": "1.pdf"}},
+        {"score": 2, "candidate": {"id": 2}, "resume": {"pdf_url": "2.pdf"}},
+    ]
+    calls = []
+
+    def get_ranked_resume_matches(keywords, supabase, limit):
+        calls.append((keywords, limit))
+        return matches
+
+    monkeypatch.setattr(
+        services, "get_ranked_resume_matches", get_ranked_resume_matches
+    )
+    return matches, calls
+
+
+def test_analyze_streams_ranked_matches(client, ranked_matches):
+    matches, calls = ranked_matches
+    snapshot = copy.deepcopy(matches)
+
+    response = client.post("/api/analyze", json={"keywords": ["Python", "SQL"]})
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert json.loads(response.get_data()) == {
+        "matches": [{**match, "rank": i} for i, match in enumerate(snapshot, 1)]
+    }
+    assert calls == [(("python", "sql"), 5)]
+    # The matches may be cached by the service layer and must stay unranked.
+    assert matches == snapshot
+
+
+def test_analyze_streams_empty_match_list(client, ranked_matches):
+    matches, _ = ranked_matches
+    matches.clear()
+
+    response = client.post("/api/analyze", json={"keywords": ["python"]})
+
+    assert response.status_code == 200
+    assert json.loads(response.get_data()) == {"matches": []}
+
+
+def test_analyze_without_usable_keywords_skips_ranking(client, ranked_matches):
+    _, calls = ranked_matches
+
+    response = client.post("/api/analyze", json={"keywords": [" ", "x"]})
+
+    assert response.json == {"matches": []}
+    assert calls == []
@@ -0,0 +1,98 @@
+# tests/test_scoring.py
+
+import pytest
+
+from src.cv_analyzer import scoring
+
+COUNTER_BUILDERS = [
+    pytest.param(scoring._build_bytes_counter, id="bytes"),
+    pytest.param(
+        scoring._build_automaton_counter,
+        id="automaton",
+        marks=pytest.mark.skipif(
+            not scoring._AHOCORASICK_AVAILABLE, reason="pyahocorasick not installed"
+        ),
+    ),
+    pytest.param(
+        scoring._build_hyperscan_counter,
+        id="hyperscan",
+        marks=pytest.mark.skipif(
+            not scoring._HYPERSCAN_AVAILABLE, reason="hyperscan not installed"
+        ),
+    ),
+    pytest.param(
+        scoring._build_stringzilla_counter,
+        id="stringzilla",
+        marks=pytest.mark.skipif(
+            not scoring._STRINGZILLA_AVAILABLE, reason="stringzilla not installed"
+        ),
+    ),
+]
+
+CASES = [
+    (["aa", "java", "javascript", "c++"], "aaaa java javascript c++ c++", 7),
+    (["aa"], "aaaaa", 2),
+    (["aba"], "abababa", 2),
+    (["python", "sql"], "python, sql and more python", 3),
+    (["go", "golang"], "golang go gopher", 4),
+    (["café", "naïve"], "café naïve cafécafé", 4),
+    (["rust"], "", 0),
+    (["rust"], "no match here", 0),
+]
+
+
+@pytest.mark.parametrize("build", COUNTER_BUILDERS)
+@pytest.mark.parametrize("keywords, text, expected", CASES)
+def test_counters_agree(build, keywords, text, expected):
+    assert build(keywords)(text) == expected
+
+
+@pytest.mark.parametrize("keywords, text, expected", CASES)
+def test_build_keyword_counter_matches_bytes_count(keywords, text, expected):
+    assert scoring.build_keyword_counter(keywords)(text) == expected
+
+
+def test_build_keyword_counter_lowercases_and_dedupes_keywords():
+    assert scoring.build_keyword_counter(["Python", "python", ""])("python") == 1
+
+
+def test_build_keyword_counter_without_keywords():
+    assert scoring.build_keyword_counter([])("python") == 0
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    """Replaces every counter builder with one that reports its name."""
+    for name in ("stringzilla", "hyperscan", "automaton", "bytes"):
+        monkeypatch.setattr(
+            scoring, f"_build_{name}_counter", lambda keywords, name=name: name
+        )
+
+    def install(*available):
+        monkeypatch.setattr(
+            scoring, "_STRINGZILLA_AVAILABLE", "stringzilla" in available
+        )
+        monkeypatch.setattr(scoring, "_HYPERSCAN_AVAILABLE", "hyperscan" in available)
+        monkeypatch.setattr(scoring, "_AHOCORASICK_AVAILABLE", "automaton" in available)
+
+    return install
+
+
+def _keywords(count):
+    return [f"skill{i}" for i in range(count)]
+
+
+@pytest.mark.parametrize(
+    "available, count, expected",
+    [
+        (("stringzilla", "hyperscan", "automaton"), 1, "stringzilla"),
+        (("hyperscan", "automaton"), scoring.HYPERSCAN_MIN_KEYWORDS - 1, "bytes"),
+        (("hyperscan", "automaton"), scoring.HYPERSCAN_MIN_KEYWORDS, "hyperscan"),
+        (("automaton",), scoring.AUTOMATON_MIN_KEYWORDS - 1, "bytes"),
+        (("automaton",), scoring.AUTOMATON_MIN_KEYWORDS, "automaton"),
+        ((), 100, "bytes"),
+    ],
+)
+def test_build_keyword_counter_picks_backend(backends, available, count, expected):
+    backends(*available)
+    assert scoring.build_keyword_counter(_keywords(count)) == expected
@@ -0,0 +1,672 @@
+# tests/test_services.py
+
+import re
+import threading
+from concurrent.futures import Future
+from types import SimpleNamespace
+from urllib.parse import quote
+
+import pytest
+
+from src.cv_analyzer import services
+
+
+def _postgrest_like_patterns(or_filter):
+    """
+    Decodes an `or` filter the way PostgREST does: splits on commas outside
+    double quotes, unquotes each value and maps `*` to `%`.
+    """
+    patterns, value, in_quotes, escaped = [], "", False, False
+    for char in or_filter + ",":
+        if escaped:
+            value += char
+            escaped = False
+        elif in_quotes and char == "\\":
+            escaped = True
+        elif char == '"':
+            in_quotes = not in_quotes
+        elif char == "," and not in_quotes:
+            column, operator, pattern = value.split(".", 2)
+            assert (column, operator) == ("resume_text_lower", "like")
+            patterns.append(pattern.replace("*", "%"))
+            value = ""
+        else:
+            value += char
+    return patterns
+
+
+def _like_matches(pattern, text):
+    regex, chars = "", iter(pattern)
+    for char in chars:
+        if char == "\\":
+            regex += re.escape(next(chars))
+        elif char == "%":
+            regex += ".*"
+        elif char == "_":
+            regex += "."
+        else:
+            regex += re.escape(char)
+    return re.fullmatch(regex, text, re.DOTALL) is not None
+
+
+def test_contains_any_filter_quotes_each_keyword():
+    assert services._contains_any_filter("resume_text_lower", ["python", "sql"]) == (
+        'resume_text_lower.like."%python%",resume_text_lower.like."%sql%"'
+    )
+
+
+@pytest.mark.parametrize(
+    "keyword, expected",
+    [
+        ("50%", r'resume_text_lower.like."%50\\%%"'),
+        ("a_b", r'resume_text_lower.like."%a\\_b%"'),
+        ("c:\\dir", r'resume_text_lower.like."%c:\\\\dir%"'),
+        ('say "hi"', r'resume_text_lower.like."%say \"hi\"%"'),
+        ("c++, c#", r'resume_text_lower.like."%c++, c#%"'),
+        ("f(x)", r'resume_text_lower.like."%f(x)%"'),
+        ("c*", r'resume_text_lower.like."%c_%"'),
+    ],
+)
+def test_contains_any_filter_escapes_special_characters(keyword, expected):
+    assert services._contains_any_filter("resume_text_lower", [keyword]) == expected
+
+
+@pytest.mark.parametrize(
+    "keyword, near_miss",
+    [
+        ("50%", "50 percent"),
+        ("a_b", "axb"),
+        ("c:\\dir", "c:/dir"),
+        ('say "hi"', "say hi"),
+        ("c++, c#", "c++ c#"),
+        ("f(x)", "f(y)"),
+        ("x,)y", "x)y"),
+    ],
+)
+def test_contains_any_filter_matches_keyword_literally(keyword, near_miss):
+    (pattern,) = _postgrest_like_patterns(
+        services._contains_any_filter("resume_text_lower", [keyword])
+    )
+
+    assert _like_matches(pattern, f"skills: {keyword} and more")
+    assert not _like_matches(pattern, f"skills: {near_miss} and more")
+
+
+def test_contains_any_filter_relaxes_literal_star():
+    (pattern,) = _postgrest_like_patterns(
+        services._contains_any_filter("resume_text_lower", ["c*"])
+    )
+
+    # PostgREST cannot express a literal `*`, so the prefilter may return a
+    # superset; it must never miss a resume containing the keyword.
+    assert _like_matches(pattern, "skills: c* and more")
+    assert not _like_matches(pattern, "skills: c")
+
+
+class _StubQuery:
+    def __init__(self, client, table):
+        self.client, self.table, self.filters = client, table, {}
+
+    def select(self, columns, count=None, head=False):
+        self.filters["select"] = columns
+        if count is not None:
+            self.filters["count"], self.filters["head"] = count, head
+        return self
+
+    def ilike(self, column, pattern):
+        self.filters["ilike"] = (column, pattern)
+        return self
+
+    def range(self, start, end):
+        self.filters["range"] = (start, end)
+        return self
+
+    def or_(self, filters):
+        self.filters["or"] = filters
+        return self
+
+    def gt(self, column, value):
+        self.filters["gt"] = (column, value)
+        return self
+
+    def order(self, column, desc=False):
+        self.filters["order"] = column
+        if desc:
+            self.filters["desc"] = True
+        return self
+
+    def limit(self, count):
+        self.filters["limit"] = count
+        return self
+
+    def in_(self, column, values):
+        self.filters["in"] = (column, values)
+        return self
+
+    def execute(self):
+        self.client.requests.append((self.table, self.filters))
+        rows = self.client.tables[self.table]
+        if "gt" in self.filters:
+            column, value = self.filters["gt"]
+            rows = [row for row in rows if row[column] > value]
+        if "in" in self.filters:
+            column, values = self.filters["in"]
+            rows = [row for row in rows if row[column] in values]
+        if "ilike" in self.filters:
+            column, pattern = self.filters["ilike"]
+            needle = pattern.strip("%").lower()
+            rows = [row for row in rows if needle in row[column].lower()]
+        if self.filters.get("head"):
+            count = self.client.head_counts.get(self.table, len(rows))
+            return SimpleNamespace(data=[], count=count)
+        if "order" in self.filters:
+            column = self.filters["order"]
+            rows = sorted(
+                rows, key=lambda row: row[column], reverse="desc" in self.filters
+            )
+        if "range" in self.filters:
+            start, end = self.filters["range"]
+            rows = rows[start : end + 1]
+        if "limit" in self.filters:
+            rows = rows[: self.filters["limit"]]
+        return SimpleNamespace(data=rows, count=None)
+
+
+class _StubRpc:
+    def __init__(self, client, name, params):
+        self.client, self.name, self.params = client, name, params
+
+    def execute(self):
+        self.client.requests.append((f"rpc:{self.name}", self.params))
+        return SimpleNamespace(data=self.client.rpc_results.get(self.name))
+
+
+class _StubSupabase:
+    """Serves PostgREST-style queries from in-memory rows, logging each one."""
+
+    def __init__(self, **tables):
+        self.tables, self.requests = tables, []
+        self.rpc_results, self.head_counts = {}, {}
+
+    def table(self, name):
+        return _StubQuery(self, name)
+
+    def rpc(self, name, params):
+        return _StubRpc(self, name, params)
+
+    def candidate_requests(self):
+        return [filters for table, filters in self.requests if table == "candidates"]
+
+    def rpc_requests(self, name):
+        return [params for table, params in self.requests if table == f"rpc:{name}"]
+
+    def resume_requests(self):
+        return [filters for table, filters in self.requests if table == "resumes"]
+
+
+def _resumes(count):
+    return [
+        {
+            "id": i,
+            "candidate_id": i,
+            "resume_text_lower": "python " * (i % 5),
+            "pdf_url": f"{i}.pdf",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(services, "RESUME_BATCH_SIZE", 2)
+    monkeypatch.setattr(services, "MAX_SCANNED_RESUMES", 3000)
+    services.clear_match_cache()
+    yield
+    services.clear_match_cache()
+
+
+@pytest.mark.parametrize(
+    "count, expected_after_ids",
+    [(0, [None]), (3, [None, 2]), (4, [None, 2, 4]), (5, [None, 2, 4])],
+)
+def test_iter_matching_resumes_pages_by_id(small_batches, count, expected_after_ids):
+    supabase = _StubSupabase(resumes=_resumes(count))
+
+    rows = list(services._iter_matching_resumes(supabase, ["python"]))
+
+    assert [row["id"] for row in rows] == list(range(1, count + 1))
+    requests = supabase.resume_requests()
+    assert [r.get("gt", (None, None))[1] for r in requests] == expected_after_ids
+    assert all(r["order"] == "id" and r["limit"] == 2 for r in requests)
+
+
+def test_iter_matching_resumes_stops_at_max_scanned(small_batches, monkeypatch):
+    monkeypatch.setattr(services, "MAX_SCANNED_RESUMES", 5)
+    supabase = _StubSupabase(resumes=_resumes(10))
+
+    rows = list(services._iter_matching_resumes(supabase, ["python"]))
+
+    assert [row["id"] for row in rows] == [1, 2, 3, 4, 5]
+    assert [r["limit"] for r in supabase.resume_requests()] == [2, 2, 1]
+
+
+def _encoded_filter_length(keywords):
+    return len(
+        quote(services._contains_any_filter("resume_text_lower", keywords), safe="")
+    )
+
+
+@pytest.mark.parametrize("slack, filtered", [(0, True), (-1, False)])
+def test_iter_matching_resumes_drops_filter_past_url_limit(
+    small_batches, monkeypatch, slack, filtered
+):
+    keywords = ["python", "sql", "c++, c#"]
+    monkeypatch.setattr(
+        services, "MAX_KEYWORD_FILTER_LENGTH", _encoded_filter_length(keywords) + slack
+    )
+    supabase = _StubSupabase(resumes=_resumes(3))
+
+    rows = list(services._iter_matching_resumes(supabase, keywords))
+
+    assert [row["id"] for row in rows] == [1, 2, 3]
+    assert all(("or" in r) == filtered for r in supabase.resume_requests())
+
+
+def test_get_ranked_resume_matches_scores_unfiltered_scan(small_batches):
+    # Hundreds of long keywords would overflow the request URL (414); the
+    # unfiltered scan must still rank by keyword hits.
+    keywords = ["python"] + [f"keyword-{i:03d}-" + "x" * 40 for i in range(300)]
+    assert _encoded_filter_length(keywords) > services.MAX_KEYWORD_FILTER_LENGTH
+    supabase = _ranked_supabase(7)
+
+    matches = services.get_ranked_resume_matches(keywords, supabase, 3)
+
+    assert [m["score"] for m in matches] == [4, 3, 2]
+    assert not any("or" in r for r in supabase.resume_requests())
+
+
+def test_get_ranked_resume_matches_returns_top_scores(small_batches):
+    resumes = _resumes(7)
+    supabase = _StubSupabase(
+        resumes=resumes,
+        candidates=[{"id": r["candidate_id"], "full_name": "x"} for r in resumes],
+    )
+
+    matches = services.get_ranked_resume_matches(["python"], supabase, 3)
+
+    assert [(m["score"], m["resume"]["pdf_url"]) for m in matches] == [
+        (4, "4.pdf"),
+        (3, "3.pdf"),
+        (2, "2.pdf"),
+    ]
+
+
+class _InlineExecutor:
+    """Runs submitted calls immediately, recording how many there were."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def test_iter_matching_resumes_prefetches_next_batch(small_batches, monkeypatch):
+    executor = _InlineExecutor()
+    monkeypatch.setattr(services, "_query_executor", executor)
+    supabase = _StubSupabase(resumes=_resumes(5))
+
+    rows = services._iter_matching_resumes(supabase, ["python"])
+
+    # The second page is requested before the first one is consumed.
+    assert next(rows)["id"] == 1
+    assert len(supabase.resume_requests()) == 2
+    assert [row["id"] for row in rows] == [2, 3, 4, 5]
+    assert len(supabase.resume_requests()) == 3
+    assert executor.submitted == 2
+
+
+def test_iter_matching_resumes_skips_prefetch_after_short_batch(
+    small_batches, monkeypatch
+):
+    executor = _InlineExecutor()
+    monkeypatch.setattr(services, "_query_executor", executor)
+    supabase = _StubSupabase(resumes=_resumes(1))
+
+    assert [
+        row["id"] for row in services._iter_matching_resumes(supabase, ["python"])
+    ] == [1]
+    assert len(supabase.resume_requests()) == 1
+    assert executor.submitted == 0
+
+
+def test_iter_matching_resumes_skips_prefetch_at_max_scanned(
+    small_batches, monkeypatch
+):
+    monkeypatch.setattr(services, "MAX_SCANNED_RESUMES", 2)
+    executor = _InlineExecutor()
+    monkeypatch.setattr(services, "_query_executor", executor)
+    supabase = _StubSupabase(resumes=_resumes(5))
+
+    assert [
+        row["id"] for row in services._iter_matching_resumes(supabase, ["python"])
+    ] == [1, 2]
+    assert executor.submitted == 0
+
+
+def _ranked_supabase(count):
+    resumes = _resumes(count)
+    return _StubSupabase(
+        resumes=resumes,
+        candidates=[{"id": r["candidate_id"], "full_name": "x"} for r in resumes],
+    )
+
+
+def test_get_ranked_resume_matches_serves_repeats_from_cache(small_batches):
+    supabase = _ranked_supabase(5)
+
+    first = services.get_ranked_resume_matches(["python", "sql"], supabase, 3)
+    requests = len(supabase.requests)
+    # Order and duplicates do not matter for the cache key.
+    again = services.get_ranked_resume_matches(["sql", "python", "python"], supabase, 3)
+
+    assert again is first
+    assert len(supabase.requests) == requests
+
+
+def test_get_ranked_resume_matches_misses_cache_for_other_limit(small_batches):
+    supabase = _ranked_supabase(5)
+
+    first = services.get_ranked_resume_matches(["python"], supabase, 3)
+    requests = len(supabase.resume_requests())
+    other = services.get_ranked_resume_matches(["python"], supabase, 2)
+
+    assert len(supabase.resume_requests()) > requests
+    assert other == first[:2]
+
+
+def test_clear_match_cache_forces_refetch(small_batches):
+    supabase = _ranked_supabase(5)
+
+    services.get_ranked_resume_matches(["python"], supabase, 3)
+    requests = len(supabase.resume_requests())
+    services.clear_match_cache()
+    services.get_ranked_resume_matches(["python"], supabase, 3)
+
+    assert len(supabase.resume_requests()) == 2 * requests
+
+
+class _BlockingQuery(_StubQuery):
+    def execute(self):
+        if self.table != "resumes" or not self.client.block_next_fetch:
+            return super().execute()
+        self.client.block_next_fetch = False
+        self.client.fetch_started.set()
+        assert self.client.release_fetch.wait(5)
+        response = super().execute()
+        if self.client.fail_fetch:
+            raise RuntimeError("resumes query failed")
+        return response
+
+
+class _BlockingSupabase(_StubSupabase):
+    """Holds the first resumes query until release_fetch is set."""
+
+    def __init__(self, fail_fetch=False, **tables):
+        super().__init__(**tables)
+        self.fail_fetch, self.block_next_fetch = fail_fetch, True
+        self.fetch_started, self.release_fetch = threading.Event(), threading.Event()
+
+    def table(self, name):
+        return _BlockingQuery(self, name)
+
+
+def _start_ranking(supabase, outcomes, name):
+    def run():
+        try:
+            outcomes[name] = services.get_ranked_resume_matches(["python"], supabase, 3)
+        except RuntimeError as e:
+            outcomes[name] = e
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def concurrent_ranking(small_batches, monkeypatch):
+    """
+    Returns a function that starts a first ranking, waits until its resumes
+    query is in flight, then starts a second one for the same key and waits
+    until it blocks on the cache condition.
+    """
+    monkeypatch.setattr(services, "_query_executor", _InlineExecutor())
+    waiting = threading.Event()
+    wait_for = services._match_cache_lock.wait_for
+
+    def recording_wait_for(predicate, timeout=None):
+        if threading.current_thread().name == "second":
+            waiting.set()
+        return wait_for(predicate, timeout)
+
+    monkeypatch.setattr(services._match_cache_lock, "wait_for", recording_wait_for)
+
+    def start(supabase, outcomes):
+        first = _start_ranking(supabase, outcomes, "first")
+        assert supabase.fetch_started.wait(5)
+        second = _start_ranking(supabase, outcomes, "second")
+        assert waiting.wait(5)
+        supabase.release_fetch.set()
+        for thread in (first, second):
+            thread.join(5)
+            assert not thread.is_alive()
+
+    return start
+
+
+def _blocking_supabase(count, fail_fetch=False):
+    resumes = _resumes(count)
+    return _BlockingSupabase(
+        fail_fetch=fail_fetch,
+        resumes=resumes,
+        candidates=[{"id": r["candidate_id"], "full_name": "x"} for r in resumes],
+    )
+
+
+def test_get_ranked_resume_matches_coalesces_concurrent_misses(concurrent_ranking):
+    supabase = _blocking_supabase(1)
+    outcomes = {}
+
+    concurrent_ranking(supabase, outcomes)
+
+    assert len(supabase.resume_requests()) == 1
+    assert outcomes["second"] is outcomes["first"]
+    assert [m["score"] for m in outcomes["first"]] == [1]
+
+
+def test_get_ranked_resume_matches_retries_after_failed_fetch(concurrent_ranking):
+    supabase = _blocking_supabase(1, fail_fetch=True)
+    outcomes = {}
+
+    concurrent_ranking(supabase, outcomes)
+
+    # The error is not cached: the waiting caller runs the query itself.
+    assert isinstance(outcomes["first"], RuntimeError)
+    assert [m["score"] for m in outcomes["second"]] == [1]
+    assert len(supabase.resume_requests()) == 2
+    assert services.get_ranked_resume_matches(["python"], supabase, 3) is (
+        outcomes["second"]
+    )
+
+
+@pytest.fixture
+def candidate_cache():
+    services.clear_candidate_cache()
+    yield
+    services.clear_candidate_cache()
+
+
+def _category_supabase(total, candidates):
+    supabase = _StubSupabase()
+    supabase.rpc_results = {
+        "count_candidates_by_category": total,
+        "candidates_by_category": [{"candidate": c} for c in candidates],
+    }
+    return supabase
+
+
+@pytest.mark.parametrize(
+    "search_term, expected_search", [("", None), ("   ", None), ("ann", "ann")]
+)
+def test_get_paginated_candidates_passes_category_params(
+    candidate_cache, search_term, expected_search
+):
+    supabase = _category_supabase(1, [{"id": 7, "full_name": "Ann"}])
+
+    candidates, total = services.get_paginated_candidates(
+        supabase, 1, 10, search_term, "engineering"
+    )
+
+    assert (candidates, total) == ([{"id": 7, "full_name": "Ann"}], 1)
+    params = {"category_filter": "engineering", "search_term": expected_search}
+    assert supabase.rpc_requests("count_candidates_by_category") == [params]
+    assert supabase.rpc_requests("candidates_by_category") == [
+        {**params, "page_offset": 0, "page_limit": 10}
+    ]
+
+
+def test_get_paginated_candidates_offsets_category_page(candidate_cache):
+    supabase = _category_supabase(25, [{"id": 11}, {"id": 12}])
+
+    candidates, total = services.get_paginated_candidates(
+        supabase, 2, 10, "", "engineering"
+    )
+
+    assert (candidates, total) == ([{"id": 11}, {"id": 12}], 25)
+    (params,) = supabase.rpc_requests("candidates_by_category")
+    assert (params["page_offset"], params["page_limit"]) == (10, 10)
+
+
+def test_get_paginated_candidates_returns_empty_category(candidate_cache):
+    supabase = _category_supabase(0, [])
+
+    assert services.get_paginated_candidates(supabase, 1, 10, "", "design") == (
+        [],
+        0,
+    )
+
+
+def _candidates(*names):
+    return [
+        {"id": i, "full_name": name, "created_at": f"2024-01-{i:02d}"}
+        for i, name in enumerate(names, start=1)
+    ]
+
+
+@pytest.fixture
+def inline_queries(monkeypatch):
+    executor = _InlineExecutor()
+    monkeypatch.setattr(services, "_query_executor", executor)
+    return executor
+
+
+def test_get_paginated_candidates_counts_category_concurrently(
+    candidate_cache, inline_queries
+):
+    supabase = _category_supabase(3, [{"id": 1}])
+
+    assert services.get_paginated_candidates(supabase, 1, 1, "", "design") == (
+        [{"id": 1}],
+        3,
+    )
+    assert inline_queries.submitted == 1
+    assert [table for table, _ in supabase.requests] == [
+        "rpc:count_candidates_by_category",
+        "rpc:candidates_by_category",
+    ]
+
+
+def test_get_paginated_candidates_counts_search_with_head_request(
+    candidate_cache, inline_queries
+):
+    supabase = _StubSupabase(candidates=_candidates("Ann", "Bob", "Joanna", "Anne"))
+
+    candidates, total = services.get_paginated_candidates(supabase, 1, 2, "ann", "all")
+
+    assert [c["full_name"] for c in candidates] == ["Anne", "Joanna"]
+    assert total == 3
+    assert inline_queries.submitted == 1
+    count, page = supabase.candidate_requests()
+    assert (count["count"], count["head"]) == ("exact", True)
+    assert "range" not in count
+    assert count["ilike"] == page["ilike"] == ("full_name", "%ann%")
+    assert (page["range"], page["order"], page["desc"]) == ((0, 1), "created_at", True)
+
+
+def test_get_paginated_candidates_defaults_missing_head_count(
+    candidate_cache, inline_queries
+):
+    supabase = _StubSupabase(candidates=_candidates("Ann"))
+    supabase.head_counts["candidates"] = None
+
+    candidates, total = services.get_paginated_candidates(supabase, 1, 10, "", "all")
+
+    assert [c["full_name"] for c in candidates] == ["Ann"]
+    assert total == 0
+    count, page = supabase.candidate_requests()
+    assert "ilike" not in count and "ilike" not in page
+
+
+def test_get_paginated_candidates_defaults_missing_category_count(
+    candidate_cache, inline_queries
+):
+    supabase = _category_supabase(None, [{"id": 1}])
+
+    assert services.get_paginated_candidates(supabase, 1, 10, "", "design") == (
+        [],
+        0,
+    )
+
+
+def test_get_paginated_candidates_serves_repeats_from_cache(candidate_cache):
+    supabase = _StubSupabase(candidates=_candidates("Ann", "Bob"))
+
+    first = services.get_paginated_candidates(supabase, 1, 10, "", "all")
+    requests = len(supabase.requests)
+    again = services.get_paginated_candidates(supabase, 1, 10, "", "all")
+
+    assert again is first
+    assert len(supabase.requests) == requests
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        (2, 10, "", "all"),
+        (1, 5, "", "all"),
+        (1, 10, "ann", "all"),
+        (1, 10, "", "design"),
+    ],
+)
+def test_get_paginated_candidates_misses_cache_for_other_args(candidate_cache, args):
+    supabase = _category_supabase(1, [{"id": 1}])
+    supabase.tables["candidates"] = _candidates("Ann", "Bob")
+
+    services.get_paginated_candidates(supabase, 1, 10, "", "all")
+    requests = len(supabase.requests)
+    services.get_paginated_candidates(supabase, *args)
+
+    assert len(supabase.requests) == requests + 2
+
+
+def test_clear_candidate_cache_forces_refetch(candidate_cache):
+    supabase = _StubSupabase(candidates=_candidates("Ann"))
+
+    services.get_paginated_candidates(supabase, 1, 10, "", "all")
+    services.clear_candidate_cache()
+    services.get_paginated_candidates(supabase, 1, 10, "", "all")
+
+    assert len(supabase.candidate_requests()) == 4